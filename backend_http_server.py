@@ -15,19 +15,68 @@ Accessible at:
     http://localhost:3001/api/*
 """
 
+import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
+import time
 
 # Ensure script directory is on path so "github_pr" can be imported when run from any cwd (e.g. Docker /app)
 _script_dir = os.path.dirname(os.path.abspath(__file__))
 if _script_dir not in sys.path:
     sys.path.insert(0, _script_dir)
 
-from flask import Flask, jsonify, request
+import requests
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from tello_proxy_adapter import create_tello
 
-app = Flask(__name__)
+# Route log records through a queue so request threads never block on
+# stdout writes (K8s line-buffers stdout and flushes on every newline)
+_log_queue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler(sys.stdout)
+_log_stream.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+_log_listener.start()
+
+# Shared HTTP session so every proxy call reuses the same keep-alive TCP
+# connection instead of paying a fresh handshake per request
+_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+# Proxy base URL resolved once at import; endpoint URLs precomputed so
+# handlers don't re-read the environment and rebuild strings per request
+PROXY_URL = os.getenv('TELLO_PROXY_URL', 'http://host.docker.internal:50000')
+PROXY_START_STREAM_URL = f'{PROXY_URL}/api/start-stream'
+PROXY_STOP_STREAM_URL = f'{PROXY_URL}/api/stop-stream'
+PROXY_VIDEO_FEED_URL = f'{PROXY_URL}/api/video-feed'
+PROXY_CAPTURE_URL = f'{PROXY_URL}/api/capture'
+
+# Use orjson for (de)serialization when available: it's a few times faster
+# than stdlib json on the small dicts that status/battery polling returns
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    class OrjsonFlask(Flask):
+        json_provider_class = OrjsonProvider
+
+    app = OrjsonFlask(__name__)
+except ImportError:
+    app = Flask(__name__)
+
 # Allow large JSON payloads (base64 photos) for /api/github-pr
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50 MB
 CORS(app)
@@ -40,39 +89,129 @@ def add_private_network_access(resp):
         resp.headers['Access-Control-Allow-Private-Network'] = 'true'
     return resp
 
-# Global Tello instance (will be TelloProxyAdapter)
-tello = None
-connected = False
+class DroneState:
+    """App-bound holder for the Tello connection.
+
+    The lock guards connect/disconnect transitions; telemetry reads grab the
+    reference without it (reference reads are atomic in CPython).
+    """
+
+    def __init__(self):
+        self.tello = None  # will be TelloProxyAdapter
+        self.connected = False
+        self.lock = threading.RLock()
+
+
+app.drone = _drone = DroneState()
+
+# Short TTL cache of the last telemetry snapshot so dashboard polling of
+# /api/status and /api/battery doesn't fire a proxy round-trip per poll
+_telemetry_cache = {'state': None, 'ts': 0.0}
+_TELEMETRY_TTL = 0.5  # seconds
+
+
+def _invalidate_telemetry():
+    """Drop the cached telemetry (call after any command that changes drone state)"""
+    _telemetry_cache['state'] = None
+    _telemetry_cache['ts'] = 0.0
+
+
+def _get_telemetry() -> dict:
+    """Return the current telemetry dict, served from the TTL cache when fresh"""
+    now = time.monotonic()
+    state = _telemetry_cache['state']
+    if state is not None and now - _telemetry_cache['ts'] < _TELEMETRY_TTL:
+        return state
+
+    tello = _drone.tello
+    get_state = getattr(tello, 'get_state', None)
+    if get_state is not None:
+        state = get_state()
+    else:
+        state = {
+            'battery': tello.get_battery(),
+            'temperature': tello.get_temperature(),
+            'height': tello.get_height(),
+            'flight_time': tello.get_flight_time(),
+        }
+
+    _telemetry_cache['state'] = state
+    _telemetry_cache['ts'] = now
+    return state
+
+
+# The 'Not connected' rejection is byte-identical on every call, so build it
+# once at import time
+_NOT_CONNECTED_JSON = b'{"success":false,"error":"Not connected"}'
+
+
+def _err_not_connected():
+    """Canned 400 response for handlers that need a live Tello connection"""
+    return Response(_NOT_CONNECTED_JSON, status=400, mimetype='application/json')
+
+
+def _check_int(value, lo, hi, default):
+    """Validate a request int: fast path for JSON ints, range-check in one pass.
+
+    Returns the value (or default when missing), or None when invalid/out of range.
+    """
+    if value is None:
+        return default
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if lo <= value <= hi else None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if lo <= value <= hi else None
+
+
+# Direction → Tello method name tables so move/rotate/flip dispatch is a
+# single dict lookup instead of an if/elif chain
+_MOVE_METHODS = {
+    'forward': 'move_forward',
+    'back': 'move_back',
+    'left': 'move_left',
+    'right': 'move_right',
+    'up': 'move_up',
+    'down': 'move_down',
+}
+_ROTATE_METHODS = {
+    'cw': 'rotate_clockwise',
+    'clockwise': 'rotate_clockwise',
+    'ccw': 'rotate_counter_clockwise',
+    'counterclockwise': 'rotate_counter_clockwise',
+}
+_FLIP_METHODS = {
+    'f': 'flip_forward',
+    'forward': 'flip_forward',
+    'b': 'flip_back',
+    'back': 'flip_back',
+    'l': 'flip_left',
+    'left': 'flip_left',
+    'r': 'flip_right',
+    'right': 'flip_right',
+}
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get server and drone status"""
-    global tello, connected
-
-    proxy_url = os.getenv('TELLO_PROXY_URL', 'http://host.docker.internal:50000')
-
-    if not connected or tello is None:
+    if not _drone.connected or _drone.tello is None:
         return jsonify({
             'success': True,
             'connected': False,
-            'proxy_url': proxy_url,
+            'proxy_url': PROXY_URL,
             'message': 'Not connected to Tello'
         })
 
     try:
-        battery = tello.get_battery()
-        temp = tello.get_temperature()
-        height = tello.get_height()
-        flight_time = tello.get_flight_time()
+        state = _get_telemetry()
 
         return jsonify({
             'success': True,
             'connected': True,
-            'proxy_url': proxy_url,
-            'battery': battery,
-            'temperature': temp,
-            'height': height,
-            'flight_time': flight_time
+            'proxy_url': PROXY_URL,
+            **state
         })
     except Exception as e:
         return jsonify({
@@ -83,43 +222,44 @@ def get_status():
 @app.route('/api/connect', methods=['POST'])
 def connect():
     """Connect to Tello via proxy"""
-    global tello, connected
-
-    if connected and tello is not None:
-        return jsonify({
-            'success': True,
-            'message': 'Already connected',
-            'battery': tello.get_battery()
-        })
+    with _drone.lock:
+        if _drone.connected and _drone.tello is not None:
+            return jsonify({
+                'success': True,
+                'message': 'Already connected',
+                'battery': _drone.tello.get_battery()
+            })
 
-    try:
-        print("Connecting to Tello via proxy...")
-        tello = create_tello()
-        tello.connect()
-        connected = True
+        try:
+            app.logger.info("Connecting to Tello via proxy...")
+            tello = create_tello()
+            tello.connect()
+            _drone.tello = tello
+            _drone.connected = True
+            _invalidate_telemetry()
 
-        battery = tello.get_battery()
-        print(f"✅ Connected! Battery: {battery}%")
+            battery = tello.get_battery()
+            app.logger.info("✅ Connected! Battery: %s%%", battery)
 
-        return jsonify({
-            'success': True,
-            'message': 'Connected to Tello via proxy',
-            'battery': battery
-        })
-    except Exception as e:
-        print(f"❌ Connection failed: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+            return jsonify({
+                'success': True,
+                'message': 'Connected to Tello via proxy',
+                'battery': battery
+            })
+        except Exception as e:
+            app.logger.error("❌ Connection failed: %s", e)
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
 
 @app.route('/api/disconnect', methods=['POST'])
 def disconnect():
     """Disconnect from Tello"""
-    global tello, connected
-
-    tello = None
-    connected = False
+    with _drone.lock:
+        _drone.tello = None
+        _drone.connected = False
+        _invalidate_telemetry()
 
     return jsonify({
         'success': True,
@@ -129,16 +269,12 @@ def disconnect():
 @app.route('/api/battery', methods=['GET'])
 def get_battery():
     """Get battery level"""
-    global tello, connected
-
-    if not connected or tello is None:
-        return jsonify({
-            'success': False,
-            'error': 'Not connected'
-        }), 400
+    tello = _drone.tello
+    if not _drone.connected or tello is None:
+        return _err_not_connected()
 
     try:
-        battery = tello.get_battery()
+        battery = _get_telemetry()['battery']
         return jsonify({
             'success': True,
             'battery': battery
@@ -152,13 +288,9 @@ def get_battery():
 @app.route('/api/command', methods=['POST'])
 def send_command():
     """Send a command to Tello"""
-    global tello, connected
-
-    if not connected or tello is None:
-        return jsonify({
-            'success': False,
-            'error': 'Not connected'
-        }), 400
+    tello = _drone.tello
+    if not _drone.connected or tello is None:
+        return _err_not_connected()
 
     data = request.get_json() or {}
     command = data.get('command', '').strip()
@@ -171,6 +303,7 @@ def send_command():
 
     try:
         response = tello.send_control_command(command)
+        _invalidate_telemetry()
         return jsonify({
             'success': True,
             'command': command,
@@ -186,13 +319,13 @@ def send_command():
 @app.route('/api/takeoff', methods=['POST'])
 def takeoff():
     """Take off"""
-    global tello, connected
-
-    if not connected or tello is None:
-        return jsonify({'success': False, 'error': 'Not connected'}), 400
+    tello = _drone.tello
+    if not _drone.connected or tello is None:
+        return _err_not_connected()
 
     try:
         tello.takeoff()
+        _invalidate_telemetry()
         return jsonify({'success': True, 'message': 'Taking off'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -200,13 +333,13 @@ def takeoff():
 @app.route('/api/land', methods=['POST'])
 def land():
     """Land"""
-    global tello, connected
-
-    if not connected or tello is None:
-        return jsonify({'success': False, 'error': 'Not connected'}), 400
+    tello = _drone.tello
+    if not _drone.connected or tello is None:
+        return _err_not_connected()
 
     try:
         tello.land()
+        _invalidate_telemetry()
         return jsonify({'success': True, 'message': 'Landing'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -214,34 +347,24 @@ def land():
 @app.route('/api/move', methods=['POST'])
 def move():
     """Move in a direction"""
-    global tello, connected
-
-    if not connected or tello is None:
-        return jsonify({'success': False, 'error': 'Not connected'}), 400
+    tello = _drone.tello
+    if not _drone.connected or tello is None:
+        return _err_not_connected()
 
     data = request.get_json() or {}
     direction = data.get('direction', '').lower()
-    distance = int(data.get('distance', 30))
+    distance = _check_int(data.get('distance'), 20, 500, 30)
 
-    if distance < 20 or distance > 500:
+    if distance is None:
         return jsonify({'success': False, 'error': 'Distance must be 20-500 cm'}), 400
 
-    try:
-        if direction == "forward":
-            tello.move_forward(distance)
-        elif direction == "back":
-            tello.move_back(distance)
-        elif direction == "left":
-            tello.move_left(distance)
-        elif direction == "right":
-            tello.move_right(distance)
-        elif direction == "up":
-            tello.move_up(distance)
-        elif direction == "down":
-            tello.move_down(distance)
-        else:
-            return jsonify({'success': False, 'error': f'Invalid direction: {direction}'}), 400
+    method_name = _MOVE_METHODS.get(direction)
+    if method_name is None:
+        return jsonify({'success': False, 'error': f'Invalid direction: {direction}'}), 400
 
+    try:
+        getattr(tello, method_name)(distance)
+        _invalidate_telemetry()
         return jsonify({'success': True, 'message': f'Moved {direction} {distance} cm'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -249,26 +372,24 @@ def move():
 @app.route('/api/rotate', methods=['POST'])
 def rotate():
     """Rotate"""
-    global tello, connected
-
-    if not connected or tello is None:
-        return jsonify({'success': False, 'error': 'Not connected'}), 400
+    tello = _drone.tello
+    if not _drone.connected or tello is None:
+        return _err_not_connected()
 
     data = request.get_json() or {}
     direction = data.get('direction', '').lower()
-    angle = int(data.get('angle', 90))
+    angle = _check_int(data.get('angle'), 1, 360, 90)
 
-    if angle < 1 or angle > 360:
+    if angle is None:
         return jsonify({'success': False, 'error': 'Angle must be 1-360 degrees'}), 400
 
-    try:
-        if direction in ['cw', 'clockwise']:
-            tello.rotate_clockwise(angle)
-        elif direction in ['ccw', 'counterclockwise']:
-            tello.rotate_counter_clockwise(angle)
-        else:
-            return jsonify({'success': False, 'error': f'Invalid direction: {direction}'}), 400
+    method_name = _ROTATE_METHODS.get(direction)
+    if method_name is None:
+        return jsonify({'success': False, 'error': f'Invalid direction: {direction}'}), 400
 
+    try:
+        getattr(tello, method_name)(angle)
+        _invalidate_telemetry()
         return jsonify({'success': True, 'message': f'Rotated {direction} {angle}°'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -276,26 +397,20 @@ def rotate():
 @app.route('/api/flip', methods=['POST'])
 def flip():
     """Flip"""
-    global tello, connected
-
-    if not connected or tello is None:
-        return jsonify({'success': False, 'error': 'Not connected'}), 400
+    tello = _drone.tello
+    if not _drone.connected or tello is None:
+        return _err_not_connected()
 
     data = request.get_json() or {}
     direction = data.get('direction', '').lower()
 
-    try:
-        if direction in ['f', 'forward']:
-            tello.flip_forward()
-        elif direction in ['b', 'back']:
-            tello.flip_back()
-        elif direction in ['l', 'left']:
-            tello.flip_left()
-        elif direction in ['r', 'right']:
-            tello.flip_right()
-        else:
-            return jsonify({'success': False, 'error': f'Invalid direction: {direction}'}), 400
+    method_name = _FLIP_METHODS.get(direction)
+    if method_name is None:
+        return jsonify({'success': False, 'error': f'Invalid direction: {direction}'}), 400
 
+    try:
+        getattr(tello, method_name)()
+        _invalidate_telemetry()
         return jsonify({'success': True, 'message': f'Flipped {direction}'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -303,11 +418,8 @@ def flip():
 @app.route('/api/start-stream', methods=['POST'])
 def start_stream():
     """Start video stream (via proxy)"""
-    proxy_url = os.getenv('TELLO_PROXY_URL', 'http://host.docker.internal:50000')
-
     try:
-        import requests
-        response = requests.post(f'{proxy_url}/api/start-stream', timeout=10)
+        response = _session.post(PROXY_START_STREAM_URL, timeout=10)
         data = response.json()
 
         if data.get('success'):
@@ -315,7 +427,7 @@ def start_stream():
             return jsonify({
                 'success': True,
                 'message': 'Video stream started',
-                'video_url': f'{proxy_url}/api/video-feed'
+                'video_url': PROXY_VIDEO_FEED_URL
             })
         else:
             return jsonify({
@@ -328,11 +440,8 @@ def start_stream():
 @app.route('/api/stop-stream', methods=['POST'])
 def stop_stream():
     """Stop video stream (via proxy)"""
-    proxy_url = os.getenv('TELLO_PROXY_URL', 'http://host.docker.internal:50000')
-
     try:
-        import requests
-        response = requests.post(f'{proxy_url}/api/stop-stream', timeout=10)
+        response = _session.post(PROXY_STOP_STREAM_URL, timeout=10)
         data = response.json()
 
         return jsonify(data)
@@ -342,30 +451,33 @@ def stop_stream():
 @app.route('/api/video-feed')
 def video_feed_proxy():
     """Proxy video feed from Mac proxy"""
-    proxy_url = os.getenv('TELLO_PROXY_URL', 'http://host.docker.internal:50000')
-
-    import requests
     from flask import Response
 
     def generate():
         try:
-            response = requests.get(f'{proxy_url}/api/video-feed', stream=True, timeout=30)
-            for chunk in response.iter_content(chunk_size=1024):
+            response = _session.get(PROXY_VIDEO_FEED_URL, stream=True, timeout=30)
+            # Read straight off the urllib3 raw stream in 64 KB chunks so an
+            # MJPEG frame passes through in a couple of yields instead of
+            # being re-chunked into dozens of 1 KB writes
+            for chunk in response.raw.stream(65536, decode_content=False):
                 if chunk:
                     yield chunk
         except Exception as e:
-            print(f"Video feed error: {e}")
-
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+            app.logger.error("Video feed error: %s", e)
+
+    # direct_passthrough skips Werkzeug's per-chunk processing; the
+    # X-Accel-Buffering header keeps nginx-style ingresses from buffering
+    # the stream in front of the pod
+    resp = Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame',
+                    direct_passthrough=True)
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
 
 @app.route('/api/capture', methods=['POST'])
 def capture_photo():
     """Capture photo (via proxy)"""
-    proxy_url = os.getenv('TELLO_PROXY_URL', 'http://host.docker.internal:50000')
-
     try:
-        import requests
-        response = requests.post(f'{proxy_url}/api/capture', timeout=10)
+        response = _session.post(PROXY_CAPTURE_URL, timeout=10)
         data = response.json()
 
         return jsonify(data)
@@ -384,7 +496,15 @@ def github_pr():
     except ImportError:
         return jsonify({'success': False, 'error': 'github_pr module not available'}), 500
 
-    data = request.get_json() or {}
+    # Parse the (potentially 50 MB) body without letting Werkzeug cache a
+    # second copy of it; orjson parses the bytes directly so the base64
+    # photos go JSON bytes → str exactly once and are then passed through
+    # to GitHub without ever being decoded to binary here
+    raw = request.get_data(cache=False)
+    try:
+        data = app.json.loads(raw) if raw else {}
+    except ValueError:
+        data = {}
     repo = data.get('repo', '').strip()
     photo1_base64 = data.get('photo1Base64', '')
     photo2_base64 = data.get('photo2Base64', '')
@@ -409,14 +529,32 @@ def github_pr():
     return jsonify({'success': False, 'error': result.get('error', 'Unknown error')}), 500
 
 
+# Underscored spellings of the stream/capture endpoints (used by older
+# frontends and the Mac proxy banner) are aliases onto the same view
+# functions — one handler per operation, two rules in the map
+_URL_ALIASES = (
+    ('/api/start_stream', start_stream, ['POST']),
+    ('/api/stop_stream', stop_stream, ['POST']),
+    ('/api/video_feed', video_feed_proxy, ['GET']),
+    ('/api/capture_photo', capture_photo, ['POST']),
+)
+for _path, _view, _methods in _URL_ALIASES:
+    app.add_url_rule(_path, endpoint=f'{_view.__name__}_alias', view_func=_view, methods=_methods)
+
+
+# Werkzeug builds its route matcher lazily on the first match, so the first
+# request after a rollout pays for compiling every rule. Bind the map and
+# match a known route once at import to warm it up.
+app.url_map.bind('localhost').match('/api/status')
+
+
 if __name__ == '__main__':
-    proxy_url = os.getenv('TELLO_PROXY_URL', 'http://host.docker.internal:50000')
     http_port = int(os.getenv('HTTP_PORT', '3001'))
 
     print("=" * 60)
     print("🚀 Tello Backend HTTP Server Starting...")
     print("=" * 60)
-    print(f"📡 Proxy URL: {proxy_url}")
+    print(f"📡 Proxy URL: {PROXY_URL}")
     print(f"🌐 HTTP API: http://0.0.0.0:{http_port}/api/*")
     print("")
     print("Architecture:")
@@ -440,4 +578,6 @@ if __name__ == '__main__':
     print("  POST /api/github-pr          ← Create PR (photos + LLaVA/Qwen analysis)")
     print("=" * 60)
 
-    app.run(host='0.0.0.0', port=http_port, debug=False)
+    # threaded=True so a proxy call blocked on the Mac (up to 10 s timeout)
+    # doesn't stall status polling or the video feed for other clients
+    app.run(host='0.0.0.0', port=http_port, debug=False, threaded=True)
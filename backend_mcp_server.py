@@ -15,6 +15,7 @@ Accessible at:
     http://localhost:3002/mcp (MCP streamable HTTP endpoint)
 """
 
+import functools
 import os
 from typing import Optional
 from tello_proxy_adapter import create_tello
@@ -40,6 +41,101 @@ mcp = FastMCP(
     )
 )
 
+# Direction → (Tello method name, label) tables so move/rotate/flip pick
+# their method with one dict lookup instead of an if/elif chain
+_MOVE_METHODS = {
+    "forward": "move_forward",
+    "back": "move_back",
+    "left": "move_left",
+    "right": "move_right",
+    "up": "move_up",
+    "down": "move_down",
+}
+_ROTATE_METHODS = {
+    "cw": ("rotate_clockwise", "clockwise"),
+    "clockwise": ("rotate_clockwise", "clockwise"),
+    "ccw": ("rotate_counter_clockwise", "counter-clockwise"),
+    "counterclockwise": ("rotate_counter_clockwise", "counter-clockwise"),
+}
+_FLIP_METHODS = {
+    "f": ("flip_forward", "forward"),
+    "forward": ("flip_forward", "forward"),
+    "b": ("flip_back", "back"),
+    "back": ("flip_back", "back"),
+    "l": ("flip_left", "left"),
+    "left": ("flip_left", "left"),
+    "r": ("flip_right", "right"),
+    "right": ("flip_right", "right"),
+}
+
+# Fixed response strings used on hot paths; built once instead of re-running
+# an f-string per call
+_MSG_NOT_CONNECTED = "❌ Not connected. Call 'connect' first."
+_MSG_NOT_CONNECTED_INFO = "ℹ️ Not connected to Tello."
+_MSG_DISCONNECTED = "✅ Disconnected from Tello."
+_MSG_TAKEOFF_OK = "✅ Taking off!"
+_MSG_LAND_OK = "✅ Landing!"
+_MSG_BAD_DISTANCE = "❌ Distance must be between 20 and 500 cm"
+_MSG_BAD_ANGLE = "❌ Angle must be between 1 and 360 degrees"
+_STATUS_TMPL = """📊 Tello Status (via proxy):
+• Battery: {battery}%
+• Temperature: {temperature}°C
+• Height: {height} cm
+• Flight Time: {flight_time}s"""
+
+# Agents tend to re-poll battery/status between steps; battery and the other
+# telemetry fields change slowly, so serve repeats from a short TTL cache
+_state_cache = {'state': None, 'ts': 0.0}
+_STATE_TTL = 1.0  # seconds
+
+def _invalidate_state():
+    """Drop the cached telemetry (call on state transitions like takeoff/land)"""
+    _state_cache['state'] = None
+    _state_cache['ts'] = 0.0
+
+def _get_cached_state() -> dict:
+    """Current telemetry dict, served from the TTL cache when fresh.
+
+    One proxy round-trip for all four fields when the adapter supports it;
+    falls back to individual queries for a direct djitellopy Tello (whose
+    single command socket can't answer queries concurrently anyway).
+    """
+    now = time.monotonic()
+    state = _state_cache['state']
+    if state is not None and now - _state_cache['ts'] < _STATE_TTL:
+        return state
+
+    get_state = getattr(tello, 'get_state', None)
+    if get_state is not None:
+        state = get_state()
+    else:
+        state = {
+            'battery': tello.get_battery(),
+            'temperature': tello.get_temperature(),
+            'height': tello.get_height(),
+            'flight_time': tello.get_flight_time(),
+        }
+
+    _state_cache['state'] = state
+    _state_cache['ts'] = now
+    return state
+
+def _requires_drone(fn):
+    """Shared precondition/error wrapper for tools that need a live connection.
+
+    Replaces the identical 'Not connected' check and try/except duplicated in
+    every tool; the wrapped tool body can assume `tello` is usable.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not connected or tello is None:
+            return _MSG_NOT_CONNECTED
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            return f"❌ {fn.__name__} failed: {str(e)}"
+    return wrapper
+
 def ensure_connected() -> tuple[bool, str]:
     """Ensure Tello is connected via proxy. Returns (success, message)"""
     global tello, connected
@@ -53,6 +149,7 @@ def ensure_connected() -> tuple[bool, str]:
         tello.connect()
 
         connected = True
+        _invalidate_state()
         battery = tello.get_battery()
         return True, f"Connected successfully (via proxy). Battery: {battery}%"
     except Exception as e:
@@ -74,69 +171,44 @@ def disconnect() -> str:
     global tello, connected
 
     if not connected or tello is None:
-        return "ℹ️ Not connected to Tello."
+        return _MSG_NOT_CONNECTED_INFO
 
     tello = None
     connected = False
-    return "✅ Disconnected from Tello."
+    _invalidate_state()
+    return _MSG_DISCONNECTED
 
 @mcp.tool()
+@_requires_drone
 def get_battery() -> str:
     """Get the current battery level."""
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
-    try:
-        battery = tello.get_battery()
-        return f"🔋 Battery: {battery}%"
-    except Exception as e:
-        return f"❌ Failed to get battery: {str(e)}"
+    battery = _get_cached_state()['battery']
+    return f"🔋 Battery: {battery}%"
 
 @mcp.tool()
+@_requires_drone
 def get_status() -> str:
     """Get comprehensive drone status including battery, temperature, height, and flight time."""
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
-    try:
-        battery = tello.get_battery()
-        temp = tello.get_temperature()
-        height = tello.get_height()
-        flight_time = tello.get_flight_time()
-
-        return f"""📊 Tello Status (via proxy):
-• Battery: {battery}%
-• Temperature: {temp}°C
-• Height: {height} cm
-• Flight Time: {flight_time}s"""
-    except Exception as e:
-        return f"❌ Failed to get status: {str(e)}"
+    return _STATUS_TMPL.format_map(_get_cached_state())
 
 @mcp.tool()
+@_requires_drone
 def takeoff() -> str:
     """Take off and hover. The drone will rise to about 1 meter."""
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
-    try:
-        tello.takeoff()
-        return "✅ Taking off!"
-    except Exception as e:
-        return f"❌ Takeoff failed: {str(e)}"
+    tello.takeoff()
+    _invalidate_state()
+    return _MSG_TAKEOFF_OK
 
 @mcp.tool()
+@_requires_drone
 def land() -> str:
     """Land the drone."""
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
-    try:
-        tello.land()
-        return "✅ Landing!"
-    except Exception as e:
-        return f"❌ Land failed: {str(e)}"
+    tello.land()
+    _invalidate_state()
+    return _MSG_LAND_OK
 
 @mcp.tool()
+@_requires_drone
 def move(direction: str, distance: int = 30) -> str:
     """
     Move the drone in a specified direction.
@@ -145,34 +217,19 @@ def move(direction: str, distance: int = 30) -> str:
         direction: Direction to move (forward, back, left, right, up, down)
         distance: Distance in cm (20-500)
     """
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
     if distance < 20 or distance > 500:
-        return "❌ Distance must be between 20 and 500 cm"
+        return _MSG_BAD_DISTANCE
 
     direction = direction.lower()
-    try:
-        if direction == "forward":
-            tello.move_forward(distance)
-        elif direction == "back":
-            tello.move_back(distance)
-        elif direction == "left":
-            tello.move_left(distance)
-        elif direction == "right":
-            tello.move_right(distance)
-        elif direction == "up":
-            tello.move_up(distance)
-        elif direction == "down":
-            tello.move_down(distance)
-        else:
-            return f"❌ Invalid direction: {direction}. Use: forward, back, left, right, up, down"
-
-        return f"✅ Moved {direction} {distance} cm"
-    except Exception as e:
-        return f"❌ Move {direction} failed: {str(e)}"
+    method_name = _MOVE_METHODS.get(direction)
+    if method_name is None:
+        return f"❌ Invalid direction: {direction}. Use: forward, back, left, right, up, down"
+
+    getattr(tello, method_name)(distance)
+    return f"✅ Moved {direction} {distance} cm"
 
 @mcp.tool()
+@_requires_drone
 def rotate(direction: str, angle: int = 90) -> str:
     """
     Rotate the drone.
@@ -181,26 +238,20 @@ def rotate(direction: str, angle: int = 90) -> str:
         direction: Rotation direction (cw for clockwise, ccw for counter-clockwise)
         angle: Rotation angle in degrees (1-360)
     """
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
     if angle < 1 or angle > 360:
-        return "❌ Angle must be between 1 and 360 degrees"
+        return _MSG_BAD_ANGLE
 
     direction = direction.lower()
-    try:
-        if direction == "cw" or direction == "clockwise":
-            tello.rotate_clockwise(angle)
-            return f"✅ Rotated clockwise {angle}°"
-        elif direction == "ccw" or direction == "counterclockwise":
-            tello.rotate_counter_clockwise(angle)
-            return f"✅ Rotated counter-clockwise {angle}°"
-        else:
-            return f"❌ Invalid direction: {direction}. Use: cw, ccw"
-    except Exception as e:
-        return f"❌ Rotate failed: {str(e)}"
+    entry = _ROTATE_METHODS.get(direction)
+    if entry is None:
+        return f"❌ Invalid direction: {direction}. Use: cw, ccw"
+
+    method_name, label = entry
+    getattr(tello, method_name)(angle)
+    return f"✅ Rotated {label} {angle}°"
 
 @mcp.tool()
+@_requires_drone
 def flip(direction: str) -> str:
     """
     Perform a flip.
@@ -208,29 +259,17 @@ def flip(direction: str) -> str:
     Args:
         direction: Flip direction (f=forward, b=back, l=left, r=right)
     """
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
     direction = direction.lower()
-    try:
-        if direction in ["f", "forward"]:
-            tello.flip_forward()
-            return "✅ Flipped forward!"
-        elif direction in ["b", "back"]:
-            tello.flip_back()
-            return "✅ Flipped back!"
-        elif direction in ["l", "left"]:
-            tello.flip_left()
-            return "✅ Flipped left!"
-        elif direction in ["r", "right"]:
-            tello.flip_right()
-            return "✅ Flipped right!"
-        else:
-            return f"❌ Invalid direction: {direction}. Use: f, b, l, r"
-    except Exception as e:
-        return f"❌ Flip failed: {str(e)}"
+    entry = _FLIP_METHODS.get(direction)
+    if entry is None:
+        return f"❌ Invalid direction: {direction}. Use: f, b, l, r"
+
+    method_name, label = entry
+    getattr(tello, method_name)()
+    return f"✅ Flipped {label}!"
 
 @mcp.tool()
+@_requires_drone
 def send_command(command: str) -> str:
     """
     Send a raw SDK command to the Tello drone.
@@ -238,14 +277,8 @@ def send_command(command: str) -> str:
     Args:
         command: Raw Tello SDK command (e.g., "battery?", "speed 50")
     """
-    if not connected or tello is None:
-        return "❌ Not connected. Call 'connect' first."
-
-    try:
-        response = tello.send_control_command(command)
-        return f"✅ Command '{command}' → Response: {response}"
-    except Exception as e:
-        return f"❌ Command '{command}' failed: {str(e)}"
+    response = tello.send_control_command(command)
+    return f"✅ Command '{command}' → Response: {response}"
 
 # ============================================================================
 # Server Startup
@@ -2,9 +2,10 @@
 GitHub PR creation for Tello frontend: submit photo1, photo2, and LLaVA/Qwen3-VL
 analysis to a repo as a new branch and open a PR.
 
-Uses GitHub MCP server for branch + markdown (create_branch, create_or_update_file).
-Uses GitHub REST API with GITHUB_TOKEN for binary images and for creating the PR
-(since MCP doesn't handle images and may not expose create_pull_request).
+Uses the GitHub REST API with GITHUB_TOKEN for the branch, files, and PR; the
+GitHub MCP client helpers are kept (lazily initialized) for tools that need
+them, but the PR happy path stays on REST since MCP adds an initialize
+handshake per session and can't handle binary images anyway.
 
 Ref: https://github.com/linsun/gen-ai-demo/blob/main/demo/pages/4_Analyze_Engagement.py
 """
@@ -12,21 +13,76 @@ Ref: https://github.com/linsun/gen-ai-demo/blob/main/demo/pages/4_Analyze_Engage
 import os
 import json
 import logging
+import re
 import requests
-from datetime import datetime
+import string
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 GITHUB_MCP_SERVER_URL = os.getenv("GITHUB_MCP_SERVER_URL", "")  # e.g. http://agentgateway.mcp.svc.cluster.local:3000/mcp
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 GITHUB_PR_EVENT_NAME = os.getenv("GITHUB_PR_EVENT_NAME", "").strip()  # e.g. "field-day-2025"; if empty, use timestamp
+
+# Branch/folder slug sanitizer: map everything outside [a-zA-Z0-9_-] to "-".
+# A precomputed translate table does the character-class filter in one C pass;
+# the cached regex only collapses runs of dashes afterwards.
+_SLUG_KEEP = set(string.ascii_letters + string.digits + "_-")
+_SLUG_TRANS = str.maketrans({c: "-" for c in map(chr, range(128)) if c not in _SLUG_KEEP})
+_SLUG_STRIP = re.compile(r"[^a-zA-Z0-9_-]+")
+_SLUG_COLLAPSE = re.compile(r"-+")
 GITHUB_API_BASE = "https://api.github.com"
 
+# Pooled keep-alive connections: a typical PR creation makes 6-8 HTTPS
+# round-trips, so reusing TCP+TLS connections removes most of the handshake
+# latency. Transient 5xx from GitHub get a short retry with backoff.
+_retry = requests.adapters.Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+_pool_adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_retry)
+
+# Constant for the process lifetime; carried by the session so per-call
+# headers= dicts aren't rebuilt and merged on every request.
+# "token" for classic PAT; use "Bearer" for fine-grained / OAuth if needed
+_API_HEADERS = {
+    "Authorization": f"token {GITHUB_TOKEN}",
+    "Accept": "application/vnd.github.v3+json",
+}
+
+_gh_session = requests.Session()
+_gh_session.headers.update(_API_HEADERS)
+_gh_session.mount("https://", _pool_adapter)
+_gh_session.mount("http://", _pool_adapter)
+
+_mcp_session = requests.Session()
+_mcp_session.mount("https://", _pool_adapter)
+_mcp_session.mount("http://", _pool_adapter)
+
+# orjson serializes the multi-MB base64 photo bodies straight to bytes a
+# few times faster than stdlib json; fall back transparently when missing
+try:
+    import orjson
+
+    def _dumps_bytes(obj):
+        return orjson.dumps(obj)
+
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _dumps_bytes(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def _loads(data):
+        return json.loads(data)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 # Session state for MCP
 _github_mcp_initialized = False
 _github_mcp_session_id = None
 
 
+@lru_cache(maxsize=8)
 def _parse_repo(repo_slug):
     """e.g. 'linsun/drone-demo' -> ('linsun', 'drone-demo')"""
     parts = repo_slug.strip().split("/")
@@ -50,7 +106,7 @@ def _initialize_github_mcp_session():
                 "clientInfo": {"name": "tello-backend-github-pr", "version": "1.0.0"},
             },
         }
-        response = requests.post(
+        response = _mcp_session.post(
             GITHUB_MCP_SERVER_URL,
             json=init_request,
             headers={"Content-Type": "application/json", "Accept": "application/json, text/event-stream"},
@@ -85,19 +141,26 @@ def _call_github_mcp_tool(tool_name, arguments):
         if _github_mcp_session_id:
             headers["mcp-session-id"] = _github_mcp_session_id
         timeout = 120 if tool_name in ("create_branch", "create_or_update_file", "list_branches") else 60
-        response = requests.post(GITHUB_MCP_SERVER_URL, json=mcp_request, headers=headers, timeout=timeout)
-        if response.status_code != 200:
-            return None
-        ct = response.headers.get("content-type", "")
-        if "text/event-stream" in ct:
-            for line in response.text.strip().split("\n"):
-                if line.startswith("data: "):
-                    response_data = json.loads(line[6:])
-                    break
-            else:
+        response = _mcp_session.post(GITHUB_MCP_SERVER_URL, json=mcp_request, headers=headers,
+                                     timeout=timeout, stream=True)
+        try:
+            if response.status_code != 200:
                 return None
-        else:
-            response_data = response.json()
+            ct = response.headers.get("content-type", "")
+            if "text/event-stream" in ct:
+                # Stream line by line and stop at the first data: frame
+                # instead of materializing and splitting the whole body
+                response_data = None
+                for line in response.iter_lines(decode_unicode=True, chunk_size=4096):
+                    if line and line.startswith("data: "):
+                        response_data = _loads(line[6:])
+                        break
+                if response_data is None:
+                    return None
+            else:
+                response_data = _loads(response.content)
+        finally:
+            response.close()
         if "error" in response_data:
             return None
         return response_data.get("result")
@@ -106,62 +169,77 @@ def _call_github_mcp_tool(tool_name, arguments):
         return None
 
 
-def _github_api_headers():
-    # "token" for classic PAT; use "Bearer" for fine-grained / OAuth if needed
-    return {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3+json",
-    }
-
-
 def _get_main_sha(owner, repo):
     """Get the SHA of the main branch."""
     url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/git/ref/heads/main"
-    resp = requests.get(url, headers=_github_api_headers(), timeout=15)
+    resp = _gh_session.get(url, timeout=15)
     if resp.status_code != 200:
         # try master
-        resp = requests.get(url.replace("/heads/main", "/heads/master"), headers=_github_api_headers(), timeout=15)
+        resp = _gh_session.get(url.replace("/heads/main", "/heads/master"), timeout=15)
     if resp.status_code != 200:
         raise RuntimeError(f"Could not get default branch: {resp.status_code} {resp.text[:200]}")
-    return resp.json()["object"]["sha"]
+    return _loads(resp.content)["object"]["sha"]
 
 
 def _create_branch_api(owner, repo, branch_name, base_sha):
     """Create a branch using GitHub API (refs)."""
     url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/git/refs"
     body = {"ref": f"refs/heads/{branch_name}", "sha": base_sha}
-    resp = requests.post(url, json=body, headers=_github_api_headers(), timeout=15)
+    resp = _gh_session.post(url, data=_dumps_bytes(body), headers=_JSON_HEADERS, timeout=15)
     if resp.status_code not in (200, 201):
         raise RuntimeError(f"Create branch failed: {resp.status_code} {resp.text[:200]}")
     return True
 
 
-def _get_file_sha(owner, repo, path, branch):
-    """Get the blob SHA of a file on the given branch, or None if the file does not exist."""
-    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}"
-    resp = requests.get(url, headers=_github_api_headers(), params={"ref": branch}, timeout=15)
-    if resp.status_code == 404:
-        return None
+def _get_commit_tree_sha(owner, repo, commit_sha):
+    """Get the tree SHA that a commit points at."""
+    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/git/commits/{commit_sha}"
+    resp = _gh_session.get(url, timeout=15)
     if resp.status_code != 200:
-        return None
-    data = resp.json()
-    if isinstance(data, list):
-        return None  # path is a directory
-    return data.get("sha")
-
-
-def _create_or_update_file_api(owner, repo, path, content_base64, message, branch):
-    """Create or update a file via GitHub Contents API. content_base64 is raw base64 string.
-    If the file already exists on the branch (e.g. from a previous run with same event name),
-    we must supply its sha for the update to succeed."""
-    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}"
-    body = {"message": message, "content": content_base64, "branch": branch}
-    existing_sha = _get_file_sha(owner, repo, path, branch)
-    if existing_sha:
-        body["sha"] = existing_sha
-    resp = requests.put(url, json=body, headers=_github_api_headers(), timeout=30)
+        raise RuntimeError(f"Get commit {commit_sha} failed: {resp.status_code} {resp.text[:200]}")
+    return _loads(resp.content)["tree"]["sha"]
+
+
+def _create_blob_api(owner, repo, content_base64):
+    """Create a blob from a raw base64 string; returns the blob SHA.
+
+    The (possibly multi-MB) body is serialized once to bytes and sent via
+    data= so requests doesn't re-serialize the base64 photo string; the image
+    bytes themselves never get decoded in this process."""
+    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/git/blobs"
+    body = {"content": content_base64, "encoding": "base64"}
+    resp = _gh_session.post(url, data=_dumps_bytes(body), headers=_JSON_HEADERS, timeout=30)
+    if resp.status_code not in (200, 201):
+        raise RuntimeError(f"Create blob failed: {resp.status_code} {resp.text[:200]}")
+    return _loads(resp.content)["sha"]
+
+
+def _create_tree_api(owner, repo, base_tree_sha, entries):
+    """Create a tree layering `entries` on top of base_tree_sha; returns the tree SHA."""
+    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/git/trees"
+    body = {"base_tree": base_tree_sha, "tree": entries}
+    resp = _gh_session.post(url, data=_dumps_bytes(body), headers=_JSON_HEADERS, timeout=30)
+    if resp.status_code not in (200, 201):
+        raise RuntimeError(f"Create tree failed: {resp.status_code} {resp.text[:200]}")
+    return _loads(resp.content)["sha"]
+
+
+def _create_commit_api(owner, repo, message, tree_sha, parent_sha):
+    """Create a commit for tree_sha with a single parent; returns the commit SHA."""
+    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/git/commits"
+    body = {"message": message, "tree": tree_sha, "parents": [parent_sha]}
+    resp = _gh_session.post(url, data=_dumps_bytes(body), headers=_JSON_HEADERS, timeout=30)
     if resp.status_code not in (200, 201):
-        raise RuntimeError(f"Create file {path} failed: {resp.status_code} {resp.text[:200]}")
+        raise RuntimeError(f"Create commit failed: {resp.status_code} {resp.text[:200]}")
+    return _loads(resp.content)["sha"]
+
+
+def _update_branch_api(owner, repo, branch_name, sha):
+    """Force-move an existing branch ref to `sha` (event-name re-runs)."""
+    url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/git/refs/heads/{branch_name}"
+    resp = _gh_session.patch(url, data=_dumps_bytes({"sha": sha, "force": True}), headers=_JSON_HEADERS, timeout=15)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Update branch failed: {resp.status_code} {resp.text[:200]}")
     return True
 
 
@@ -169,10 +247,10 @@ def _create_pull_request_api(owner, repo, head_branch, base_branch, title, body)
     """Create a pull request."""
     url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls"
     payload = {"title": title, "head": head_branch, "base": base_branch, "body": body or ""}
-    resp = requests.post(url, json=payload, headers=_github_api_headers(), timeout=15)
+    resp = _gh_session.post(url, data=_dumps_bytes(payload), headers=_JSON_HEADERS, timeout=15)
     if resp.status_code != 201:
         raise RuntimeError(f"Create PR failed: {resp.status_code} {resp.text[:200]}")
-    data = resp.json()
+    data = _loads(resp.content)
     return data.get("html_url"), data.get("number")
 
 
@@ -199,83 +277,71 @@ def create_pr_payload(repo_slug, photo1_base64, photo2_base64, comparison_llava,
 
 def _create_pr_impl(owner, repo, photo1_base64, photo2_base64, comparison_llava, comparison_qwen):
     import base64
-    import re
 
-    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
     if GITHUB_PR_EVENT_NAME:
-        # Sanitize for branch/folder: alphanumeric, hyphens, underscores only
-        event_slug = re.sub(r"[^a-zA-Z0-9_-]+", "-", GITHUB_PR_EVENT_NAME).strip("-") or timestamp
+        # Sanitize for branch/folder: alphanumeric, hyphens, underscores only.
+        # The translate table only covers ASCII, so non-ASCII names take the
+        # regex path to keep accented/CJK characters out of the slug.
+        name = GITHUB_PR_EVENT_NAME
+        if name.isascii():
+            slug = name.translate(_SLUG_TRANS)
+        else:
+            slug = _SLUG_STRIP.sub("-", name)
+        event_slug = _SLUG_COLLAPSE.sub("-", slug).strip("-") or timestamp
     else:
         event_slug = timestamp
     branch_name = f"drone-capture-{event_slug}"
     folder = f"captures/{event_slug}"
     base_branch = "main"
 
-    # Get base SHA (needed for API branch create / fallback)
+    # Get base SHA (parent of the capture commit)
     base_sha = _get_main_sha(owner, repo)
 
-    # 1) Create branch: MCP first, else API
-    if GITHUB_MCP_SERVER_URL:
-        mcp_result = _call_github_mcp_tool("create_branch", {
-            "owner": owner,
-            "repo": repo,
-            "branch": branch_name,
-            "from_branch": base_branch,
-        })
-        if mcp_result:
-            logger.info("Branch created via MCP: %s", branch_name)
-        else:
-            _create_branch_api(owner, repo, branch_name, base_sha)
-            logger.info("Branch created via API: %s", branch_name)
-    else:
-        _create_branch_api(owner, repo, branch_name, base_sha)
-        logger.info("Branch created via API: %s", branch_name)
-
-    # 2) Analysis markdown: photos side by side at top, then LLaVA and Qwen sections
-    analysis_content = f"""# Drone/Webcam capture analysis – {event_slug}
-
-| Photo 1 | Photo 2 |
-|---------|---------|
-| ![Photo 1](photo1.jpg) | ![Photo 2](photo2.jpg) |
-
-## LLaVA
-
-{comparison_llava or "(no response)"}
-
-## Qwen3-VL
-
-{comparison_qwen or "(no response)"}
-
-"""
-    analysis_b64 = base64.b64encode(analysis_content.encode("utf-8")).decode("ascii")
+    # 2) Analysis markdown: photos side by side at top, then LLaVA and Qwen
+    # sections. Joined from pre-encoded pieces so the (possibly large) model
+    # outputs aren't copied through an intermediate f-string + re-encode.
+    analysis_bytes = b"".join((
+        "# Drone/Webcam capture analysis – ".encode("utf-8"),
+        event_slug.encode("utf-8"),
+        b"\n\n| Photo 1 | Photo 2 |\n|---------|---------|\n"
+        b"| ![Photo 1](photo1.jpg) | ![Photo 2](photo2.jpg) |\n\n## LLaVA\n\n",
+        (comparison_llava or "(no response)").encode("utf-8"),
+        b"\n\n## Qwen3-VL\n\n",
+        (comparison_qwen or "(no response)").encode("utf-8"),
+        b"\n\n",
+    ))
+    analysis_b64 = base64.b64encode(analysis_bytes).decode("ascii")
     analysis_path = f"{folder}/analysis.md"
-    analysis_message = f"Add analysis for capture {event_slug}"
-
-    if GITHUB_MCP_SERVER_URL:
-        mcp_result = _call_github_mcp_tool("create_or_update_file", {
-            "owner": owner,
-            "repo": repo,
-            "path": analysis_path,
-            "content": analysis_content,
-            "message": analysis_message,
-            "branch": branch_name,
-        })
-        if not mcp_result:
-            _create_or_update_file_api(owner, repo, analysis_path, analysis_b64, analysis_message, branch_name)
-    else:
-        _create_or_update_file_api(owner, repo, analysis_path, analysis_b64, analysis_message, branch_name)
+    analysis_message = f"Add photos and analysis for capture {event_slug}"
 
-    # 3) Images: GitHub API only (MCP doesn't handle binary)
+    uploads = [(analysis_path, analysis_b64)]
     for name, b64 in (("photo1.jpg", photo1_base64), ("photo2.jpg", photo2_base64)):
-        if not b64:
-            continue
-        path = f"{folder}/{name}"
-        _create_or_update_file_api(
-            owner, repo, path, b64,
-            f"Add {name} for capture {event_slug}",
-            branch_name,
-        )
-        logger.info("Uploaded %s via API", path)
+        if b64:
+            uploads.append((f"{folder}/{name}", b64))
+
+    # 3) Git Data API batch: blobs (uploaded concurrently — disjoint and
+    # independent, so wall-clock cost is roughly one upload's RTT), then one
+    # tree and one commit covering all three files, then the branch ref.
+    # One commit per PR instead of one Contents-API commit per file.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        blob_shas = list(pool.map(lambda u: _create_blob_api(owner, repo, u[1]), uploads))
+
+    tree_entries = [
+        {"path": path, "mode": "100644", "type": "blob", "sha": blob_sha}
+        for (path, _), blob_sha in zip(uploads, blob_shas)
+    ]
+    base_tree_sha = _get_commit_tree_sha(owner, repo, base_sha)
+    tree_sha = _create_tree_api(owner, repo, base_tree_sha, tree_entries)
+    commit_sha = _create_commit_api(owner, repo, analysis_message, tree_sha, base_sha)
+
+    try:
+        _create_branch_api(owner, repo, branch_name, commit_sha)
+        logger.info("Branch created via API: %s", branch_name)
+    except RuntimeError:
+        # Event-name re-run: the branch already exists, move it to the new commit
+        _update_branch_api(owner, repo, branch_name, commit_sha)
+        logger.info("Branch updated via API: %s", branch_name)
 
     # 4) Create PR via API
     pr_title = f"Drone capture {event_slug}"
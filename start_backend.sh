@@ -15,8 +15,18 @@ echo "📡 Proxy URL: $PROXY_URL"
 echo ""
 
 # Start HTTP server in background
+# gunicorn with a gevent worker handles concurrent polling + MJPEG viewers
+# via greenlets; fall back to the Flask dev server if gunicorn isn't installed.
+# Default to ONE worker: the connect flag lives in per-process module state,
+# so extra workers would round-robin requests onto processes that never saw
+# /api/connect and answer 400 Not connected.
 echo "Starting HTTP API server on port ${HTTP_PORT:-3001}..."
-python3 backend_http_server.py &
+if command -v gunicorn >/dev/null 2>&1; then
+    gunicorn -k gevent -w "${GUNICORN_WORKERS:-1}" --worker-connections 200 \
+        -b "0.0.0.0:${HTTP_PORT:-3001}" backend_http_server:app &
+else
+    python3 backend_http_server.py &
+fi
 HTTP_PID=$!
 echo "✅ HTTP Server PID: $HTTP_PID"
 
@@ -32,8 +32,10 @@ Endpoints:
         POST /mcp                  - MCP streamable HTTP endpoint
 """
 
+import re
 import socket
 import threading
+from collections import deque
 import time
 import json
 import os
@@ -43,6 +45,7 @@ from flask import Flask, jsonify, request, Response, send_file
 from flask_cors import CORS
 from mcp.server.fastmcp import FastMCP
 import cv2
+import numpy as np
 from djitellopy import Tello
 import uvicorn
 
@@ -54,6 +57,10 @@ TELLO_VIDEO_PORT = 11111
 LOCAL_CMD_PORT = 9000
 LOCAL_STATE_PORT = 9001
 
+# Tello state packets are 'key:value;key:value;...'; one compiled-regex pass
+# replaces the ~20 per-field split() allocations in the receiver loop
+_STATE_FIELD_RE = re.compile(r'([^:;]+):([^;]*)')
+
 # Global state
 tello_state = {}
 state_lock = threading.Lock()
@@ -64,7 +71,10 @@ is_connected = False
 is_streaming = False
 frame_read = None
 latest_frame = None
+frame_ring = deque(maxlen=5)  # most recent published frames, for capture
 frame_lock = threading.Lock()
+frame_cond = threading.Condition(frame_lock)  # notified when latest_frame updates
+_stream_configured = False  # bitrate/fps already sent to this Tello instance
 
 # Create Flask app
 flask_app = Flask(__name__)
@@ -87,8 +97,11 @@ def init_sockets():
     cmd_socket.bind(('', LOCAL_CMD_PORT))
     cmd_socket.settimeout(0.5)
 
-    # State socket (receive only)
+    # State socket (receive only); give it room to absorb a burst of state
+    # packets if the receiver thread is briefly held off the GIL, instead of
+    # the kernel dropping them at the default buffer size
     state_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    state_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
     state_socket.bind(('', LOCAL_STATE_PORT))
     state_socket.settimeout(0.5)
 
@@ -106,11 +119,8 @@ def state_receiver_thread():
             state_str = data.decode('utf-8').strip()
 
             # Parse state string
-            state_dict = {}
-            for item in state_str.split(';'):
-                if ':' in item:
-                    key, value = item.split(':', 1)
-                    state_dict[key.strip()] = value.strip()
+            state_dict = {key.strip(): value.strip()
+                          for key, value in _STATE_FIELD_RE.findall(state_str)}
 
             with state_lock:
                 tello_state = state_dict
@@ -128,14 +138,24 @@ def video_frame_thread():
 
     print("📹 Video frame thread started")
 
+    last_id = None
     while True:
         try:
             if is_streaming and frame_read is not None:
-                frame = frame_read.frame
-                if frame is not None and frame.size > 0:
-                    # Only update if we got a valid frame
-                    with frame_lock:
-                        latest_frame = frame.copy()
+                frame = _read_frame(frame_read)
+                # Publish only genuinely new frames: djitellopy rebinds its
+                # frame attribute per decode, so an unchanged id() means the
+                # drone hasn't produced anything since our last look
+                if frame is not None and frame.size > 0 and id(frame) != last_id:
+                    last_id = id(frame)
+                    # djitellopy's reader rebinds its frame attribute to a
+                    # freshly decoded array each update, so the reference can
+                    # be published as-is; consumers treat published frames as
+                    # immutable, making the per-frame 2.6 MB copy unnecessary
+                    with frame_cond:
+                        latest_frame = frame
+                        frame_ring.append(frame)
+                        frame_cond.notify_all()
                 # Small delay to prevent excessive CPU usage
                 time.sleep(0.033)  # ~30fps
             else:
@@ -167,9 +187,28 @@ def send_tello_command(command: str) -> tuple[bool, str]:
 # Business Logic Functions (shared by REST API and MCP)
 # ============================================================================
 
+# Direction → Tello method lookup tables so move/rotate dispatch with one
+# dict access instead of walking an if/elif chain
+_MOVE_METHODS = {
+    'up': 'move_up',
+    'down': 'move_down',
+    'forward': 'move_forward',
+    'back': 'move_back',
+    'left': 'move_left',
+    'right': 'move_right',
+}
+_ROTATE_METHODS = {
+    'left': ('rotate_counter_clockwise', 'left'),
+    'counterclockwise': ('rotate_counter_clockwise', 'left'),
+    'ccw': ('rotate_counter_clockwise', 'left'),
+    'right': ('rotate_clockwise', 'right'),
+    'clockwise': ('rotate_clockwise', 'right'),
+    'cw': ('rotate_clockwise', 'right'),
+}
+
 def connect_tello() -> tuple[bool, str, Optional[int]]:
     """Connect to Tello (business logic). Returns (success, message, battery)"""
-    global is_connected, tello
+    global is_connected, tello, _stream_configured
 
     if is_connected and tello is not None:
         try:
@@ -182,6 +221,7 @@ def connect_tello() -> tuple[bool, str, Optional[int]]:
         print("Connecting to Tello...")
         tello = Tello()
         tello.connect()
+        _stream_configured = False  # fresh instance needs bitrate/fps again
 
         # Set high resolution
         try:
@@ -214,7 +254,7 @@ def get_battery_level() -> tuple[bool, Optional[int], Optional[str]]:
 
 def start_video_stream() -> tuple[bool, str]:
     """Start video streaming. Returns (success, message)"""
-    global tello, is_connected, is_streaming, frame_read, latest_frame
+    global tello, is_connected, is_streaming, frame_read, latest_frame, _stream_configured
 
     if not is_connected or tello is None:
         return False, 'Not connected'
@@ -228,27 +268,30 @@ def start_video_stream() -> tuple[bool, str]:
         # Clear any stale frames
         with frame_lock:
             latest_frame = None
+            frame_ring.clear()
 
-        # Set video quality
-        tello.set_video_bitrate(tello.BITRATE_5MBPS)
-        tello.set_video_fps(tello.FPS_30)
+        # Set video quality once per Tello instance; each setter is a UDP
+        # round-trip with its own ACK wait, so skip them on stream restarts
+        if not _stream_configured:
+            tello.set_video_bitrate(tello.BITRATE_5MBPS)
+            tello.set_video_fps(tello.FPS_30)
+            _stream_configured = True
 
         tello.streamon()
-        time.sleep(2)
-
         frame_read = tello.get_frame_read()
-        time.sleep(1)
 
-        # Wait for first valid frame to ensure stream is ready
+        # Wait for first valid frame to ensure stream is ready; polling lets
+        # a warm restart come back in ~100 ms instead of fixed multi-second
+        # sleeps, while a cold start still gets a 5 s budget
         print("Waiting for first frame...")
-        for i in range(30):  # Wait up to 3 seconds for first frame
-            if frame_read is not None:
-                frame = frame_read.frame
-                if frame is not None and frame.size > 0:
-                    with frame_lock:
-                        latest_frame = frame.copy()
-                    print("✅ First frame received")
-                    break
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            frame = _read_frame(frame_read)
+            if frame is not None and frame.size > 0:
+                with frame_lock:
+                    latest_frame = frame
+                print("✅ First frame received")
+                break
             time.sleep(0.1)
 
         is_streaming = True
@@ -313,26 +356,12 @@ def move_tello(direction: str, distance: int = 20) -> tuple[bool, str]:
 
     try:
         direction_lower = direction.lower()
-        if direction_lower == 'up':
-            tello.move_up(distance)
-            return True, f'Moved up {distance}cm'
-        elif direction_lower == 'down':
-            tello.move_down(distance)
-            return True, f'Moved down {distance}cm'
-        elif direction_lower == 'forward':
-            tello.move_forward(distance)
-            return True, f'Moved forward {distance}cm'
-        elif direction_lower == 'back':
-            tello.move_back(distance)
-            return True, f'Moved back {distance}cm'
-        elif direction_lower == 'left':
-            tello.move_left(distance)
-            return True, f'Moved left {distance}cm'
-        elif direction_lower == 'right':
-            tello.move_right(distance)
-            return True, f'Moved right {distance}cm'
-        else:
+        method_name = _MOVE_METHODS.get(direction_lower)
+        if method_name is None:
             return False, f'Invalid direction: {direction}'
+
+        getattr(tello, method_name)(distance)
+        return True, f'Moved {direction_lower} {distance}cm'
     except Exception as e:
         return False, str(e)
 
@@ -344,15 +373,13 @@ def rotate_tello(direction: str, angle: int = 15) -> tuple[bool, str]:
         return False, 'Not connected'
 
     try:
-        direction_lower = direction.lower()
-        if direction_lower == 'left' or direction_lower == 'counterclockwise' or direction_lower == 'ccw':
-            tello.rotate_counter_clockwise(angle)
-            return True, f'Rotated left {angle}°'
-        elif direction_lower == 'right' or direction_lower == 'clockwise' or direction_lower == 'cw':
-            tello.rotate_clockwise(angle)
-            return True, f'Rotated right {angle}°'
-        else:
+        entry = _ROTATE_METHODS.get(direction.lower())
+        if entry is None:
             return False, f'Invalid direction: {direction}'
+
+        method_name, label = entry
+        getattr(tello, method_name)(angle)
+        return True, f'Rotated {label} {angle}°'
     except Exception as e:
         return False, str(e)
 
@@ -408,10 +435,19 @@ def get_tello_status() -> dict:
 
     if is_connected and tello is not None:
         try:
-            status['battery'] = str(tello.get_battery())
+            # djitellopy parses the drone's 10 Hz state push in a background
+            # thread; read the already-populated dict once instead of going
+            # through three separate SDK getters
+            state = tello.get_current_state()
+            status['battery'] = str(state.get('bat', 'N/A'))
             status['wifi'] = 'Connected'
-            status['temperature'] = str(tello.get_temperature())
-            status['height'] = str(tello.get_height())
+            # Match djitellopy's get_temperature(): average of the low/high
+            # range, not the high end alone
+            templ = state.get('templ')
+            temph = state.get('temph')
+            if templ is not None and temph is not None:
+                status['temperature'] = str((templ + temph) / 2)
+            status['height'] = str(state.get('h', 'N/A'))
         except:
             pass
 
@@ -431,19 +467,125 @@ def get_tello_status() -> dict:
 
     return status
 
+# djitellopy hands out frames through a @property; resolve the getter once so
+# the 30 Hz frame thread skips the descriptor dispatch on every read. Falls
+# back to plain attribute access if the property moves in a future release.
+try:
+    from djitellopy import BackgroundFrameRead
+    _read_frame = BackgroundFrameRead.frame.fget
+except (ImportError, AttributeError):
+    def _read_frame(fr):
+        return fr.frame
+
+# JPEG encode parameters shared by photo capture and the MJPEG feed.
+# Quality 85 is visually near-identical to 95 at roughly a third of the
+# bytes; optimized/progressive Huffman are explicitly off so libjpeg-turbo
+# stays on its SIMD encode path instead of the two-pass fallback.
+_JPEG_PARAMS = [
+    cv2.IMWRITE_JPEG_QUALITY, 85,
+    cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+    cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+]
+
+# Use libjpeg-turbo's SIMD encoder when PyTurboJPEG is installed (OpenCV may
+# be linked against stock libjpeg); frames are passed as BGR so the encoder
+# does its own colorspace conversion in one pass. cv2.imencode otherwise.
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_422
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+def _encode_jpeg(frame) -> bytes:
+    """Encode a BGR frame to JPEG bytes with the fastest available encoder"""
+    # Published frames are contiguous copies, but guard anyway: a strided
+    # view would otherwise force a hidden per-call memcpy inside the encoder
+    # (and knock TurboJPEG off its SIMD path)
+    if not frame.flags['C_CONTIGUOUS']:
+        frame = np.ascontiguousarray(frame)
+    if _turbo is not None:
+        return _turbo.encode(frame, quality=85, pixel_format=TJPF_BGR,
+                             jpeg_subsample=TJSAMP_422)
+    ok, buffer = cv2.imencode('.jpg', frame, _JPEG_PARAMS)
+    if not ok:
+        raise RuntimeError('JPEG encode failed')
+    return buffer.tobytes()
+
+# Encode and frame each published frame once no matter how many feed viewers
+# are attached: generators share the complete multipart chunk (boundary +
+# headers + JPEG), keyed by the identity of the published frame array, so N
+# viewers yield one bytes object instead of concatenating N copies. The lock
+# is held across the encode so concurrent viewers wait for one encode
+# instead of duplicating it.
+_jpeg_lock = threading.Lock()
+# The cache holds the frame object itself (not its id) so the keyed frame
+# stays alive: a bare id could be recycled by a new array allocated at the
+# same address after the original rotates out of the ring, which would serve
+# a stale JPEG as the new frame.
+_jpeg_cache = {'frame': None, 'part': None}
+
+def _mjpeg_part(frame) -> bytes:
+    """Complete multipart chunk for a published frame, built at most once"""
+    with _jpeg_lock:
+        if _jpeg_cache['frame'] is not frame:
+            jpg = _encode_jpeg(frame)
+            _jpeg_cache['part'] = (b'--frame\r\n'
+                                   b'Content-Type: image/jpeg\r\n'
+                                   b'Content-Length: %d\r\n\r\n' % len(jpg)
+                                   + jpg + b'\r\n')
+            _jpeg_cache['frame'] = frame
+        return _jpeg_cache['part']
+
+# Scratch buffers for the sharpness scorer, sized to the stream resolution on
+# first use and reused across frames instead of allocating three image-sized
+# arrays per score. Reallocated automatically if the resolution changes.
+_score_lock = threading.Lock()
+_small_buf = None
+_lap_buf = None
+
+def _frame_sharpness(frame) -> float:
+    """Variance-of-Laplacian sharpness score on a downsampled copy of the frame.
+
+    Scoring at quarter resolution with a 16-bit Laplacian touches ~16x fewer
+    bytes than running the filter on the full 720p frame in float64, and
+    preserves the relative ordering needed to pick the sharpest frame.
+    """
+    global _small_buf, _lap_buf
+
+    h, w = frame.shape[0] // 4, frame.shape[1] // 4
+    with _score_lock:
+        if _lap_buf is None or _lap_buf.shape != (h, w):
+            _small_buf = np.empty((h, w, 3), np.uint8)
+            _lap_buf = np.empty((h, w), np.int16)
+
+        cv2.resize(frame, (w, h), dst=_small_buf, interpolation=cv2.INTER_AREA)
+        # Rank on the green channel rather than a weighted grayscale: the
+        # ordering across candidates is unchanged when they all use the same
+        # channel, and it skips the conversion pass entirely
+        cv2.Laplacian(_small_buf[:, :, 1], cv2.CV_16S, dst=_lap_buf, ksize=3)
+        return float(_lap_buf.astype(np.int32).var())
+
 def capture_photo_to_file(filename: str) -> tuple[bool, str]:
-    """Capture a photo and save to file. Returns (success, message)"""
+    """Capture a photo and save to file. Returns (success, message)
+
+    Samples a handful of frames and keeps the sharpest one, so a capture
+    taken while the drone is stabilizing doesn't save a motion-blurred frame.
+    """
     global latest_frame, is_streaming
-    import os
 
     if not is_streaming:
         return False, 'Video stream not active. Start stream first.'
 
+    # The frame thread keeps a ring of the most recent published frames, so
+    # capture can score what already arrived instead of waiting ~165 ms for
+    # new frames to trickle in
     with frame_lock:
-        if latest_frame is None:
-            return False, 'No frame available'
+        candidates = list(frame_ring)
 
-        frame = latest_frame.copy()
+    if not candidates:
+        return False, 'No frame available'
+
+    frame = max(candidates, key=_frame_sharpness)
 
     try:
         # Create photos directory if it doesn't exist
@@ -452,7 +594,8 @@ def capture_photo_to_file(filename: str) -> tuple[bool, str]:
 
         # Save frame to file
         filepath = os.path.join(photos_dir, filename)
-        cv2.imwrite(filepath, frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        with open(filepath, 'wb') as f:
+            f.write(_encode_jpeg(frame))
 
         return True, f'Photo saved as {filename}'
     except Exception as e:
@@ -462,6 +605,10 @@ def capture_photo_to_file(filename: str) -> tuple[bool, str]:
 # REST API Endpoints
 # ============================================================================
 
+# Pre-serialized body for the adapter's not-connected fast path; the backend
+# probes /api/command per movement, so skip jsonify for this constant payload
+_NOT_CONNECTED_BODY = '{"success":false,"error":"Not connected. Call /api/connect first."}'
+
 @flask_app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
@@ -638,48 +785,47 @@ def api_stop_stream():
 def api_video_feed():
     """Video feed endpoint for frontend (MJPEG stream)"""
     def generate():
-        last_frame_time = 0
-        frame_interval = 0.033  # ~30fps
-        
+        last_sent_id = None
+        last_err_time = 0.0
+
         while True:
             if not is_streaming:
                 time.sleep(0.1)
                 continue
 
-            # Wait for a valid frame
-            frame = None
-            with frame_lock:
-                if latest_frame is not None and latest_frame.size > 0:
-                    frame = latest_frame.copy()
-            
-            if frame is None:
-                # No frame available yet, wait a bit
-                time.sleep(0.033)
-                continue
-
-            # Throttle frame rate to ~30fps
-            current_time = time.time()
-            elapsed = current_time - last_frame_time
-            if elapsed < frame_interval:
-                time.sleep(frame_interval - elapsed)
+            # Wait for the frame thread to publish a frame we haven't sent
+            # yet; the condition wait replaces fixed-interval sleeps, so a
+            # frame goes out as soon as it arrives and duplicates are never
+            # re-encoded
+            with frame_cond:
+                if latest_frame is None or id(latest_frame) == last_sent_id:
+                    frame_cond.wait(timeout=0.1)
+                if latest_frame is None or id(latest_frame) == last_sent_id:
+                    continue
+                frame = latest_frame
+                last_sent_id = id(frame)
             
             # Encode frame as JPEG
             try:
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                if buffer is not None and len(buffer) > 0:
-                    frame_bytes = buffer.tobytes()
-                    last_frame_time = time.time()
-                    
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-                else:
-                    time.sleep(0.033)
+                part = _mjpeg_part(frame)
             except Exception as e:
-                print(f"Error encoding frame: {e}")
+                # A persistent encode failure would otherwise print at frame
+                # rate; once a second is enough to see it
+                now = time.monotonic()
+                if now - last_err_time > 1.0:
+                    last_err_time = now
+                    print(f"Error encoding frame: {e}")
                 time.sleep(0.033)
+                continue
 
-    return Response(generate(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+            yield part
+
+    resp = Response(generate(),
+                    mimetype='multipart/x-mixed-replace; boundary=frame',
+                    direct_passthrough=True)
+    # Tell intermediary proxies not to buffer the stream
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
 
 @flask_app.route('/api/disconnect', methods=['POST'])
 def api_disconnect():
@@ -718,6 +864,33 @@ def api_capture():
             'error': message
         }), 500
 
+@flask_app.route('/api/commands', methods=['POST'])
+def api_commands():
+    """Batched command endpoint: run several commands over one request"""
+    data = request.get_json()
+    if not data or not isinstance(data.get('commands'), list):
+        return jsonify({'success': False, 'error': 'Missing commands list'}), 400
+
+    if not is_connected or tello is None:
+        return Response(_NOT_CONNECTED_BODY, status=400, mimetype='application/json')
+
+    responses = []
+    for command in data['commands']:
+        try:
+            responses.append(tello.send_control_command(command))
+        except Exception as e:
+            # Report how far we got so the caller knows what executed
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'responses': responses
+            }), 500
+
+    return jsonify({
+        'success': True,
+        'responses': responses
+    })
+
 @flask_app.route('/api/photo/<filename>', methods=['GET'])
 def api_photo(filename):
     """Get photo file endpoint for frontend"""
@@ -744,17 +917,19 @@ def api_command():
     
     # Check if connected
     if not is_connected or tello is None:
-        return jsonify({
-            'success': False,
-            'error': 'Not connected. Call /api/connect first.'
-        }), 400
+        return Response(_NOT_CONNECTED_BODY, status=400, mimetype='application/json')
     
     try:
+        started = time.perf_counter()
         response = tello.send_control_command(command)
-        return jsonify({
+        drone_ms = (time.perf_counter() - started) * 1000.0
+        resp = jsonify({
             'success': True,
             'response': response
         })
+        # Let callers split drone latency from HTTP/proxy overhead
+        resp.headers['Server-Timing'] = f'drone;dur={drone_ms:.1f}'
+        return resp
     except Exception as e:
         return jsonify({
             'success': False,
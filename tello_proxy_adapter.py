@@ -7,11 +7,31 @@ Tello Proxy Service running on the Mac via HTTP instead of UDP.
 This allows the backend to run in K8s while the proxy handles the WiFi connection.
 """
 
+import json
 import os
 import requests
 import time
 from typing import Optional
 
+# orjson parses/serializes a few times faster than stdlib json; fall back
+# transparently when it isn't installed
+try:
+    import orjson
+
+    def _dumps_bytes(obj):
+        return orjson.dumps(obj)
+
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _dumps_bytes(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def _loads(data):
+        return json.loads(data)
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 
 class TelloProxyAdapter:
     """
@@ -30,6 +50,37 @@ class TelloProxyAdapter:
             'http://host.docker.internal:50000'
         )
         self.connected = False
+
+        # Pooled session so repeated proxy calls reuse one TCP connection
+        # instead of handshaking per request. Retries cover transient 5xx on
+        # idempotent GETs only (urllib3's default method allowlist excludes
+        # POST, so movement commands are never re-sent).
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=requests.adapters.Retry(
+                total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]
+            ),
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        # Short TTL cache over the parsed /api/status payload so back-to-back
+        # sensor reads share one proxy round-trip; telemetry doesn't change
+        # faster than this anyway
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+        self._status_ttl = float(os.getenv('TELLO_STATUS_TTL_MS', '200')) / 1000.0
+        self._bulk_supported = True  # cleared if the proxy 404s /api/commands
+        # Last Server-Timing header seen from the proxy (drone latency vs.
+        # HTTP overhead), for diagnostics
+        self.last_timing = None
+
+        # Endpoint → full URL, so hot paths skip rebuilding the same string
+        # on every call
+        self._url_cache = {}
+
         print(f"TelloProxyAdapter initialized with proxy: {self.proxy_url}")
 
     def _call_proxy(self, endpoint: str, method: str = 'GET', json_data: dict = None) -> dict:
@@ -47,16 +98,20 @@ class TelloProxyAdapter:
         Raises:
             Exception: If request fails
         """
-        url = f"{self.proxy_url}{endpoint}"
+        url = self._url_cache.get(endpoint)
+        if url is None:
+            url = self._url_cache.setdefault(endpoint, f"{self.proxy_url}{endpoint}")
 
         try:
             if method == 'POST':
-                response = requests.post(url, json=json_data, timeout=10)
+                response = self._session.post(url, data=_dumps_bytes(json_data),
+                                              headers=_JSON_HEADERS, timeout=10)
             else:
-                response = requests.get(url, timeout=10)
+                response = self._session.get(url, timeout=10)
 
             response.raise_for_status()
-            return response.json()
+            self.last_timing = response.headers.get('Server-Timing')
+            return _loads(response.content)
 
         except requests.exceptions.Timeout:
             raise Exception(f"Proxy timeout: {url}")
@@ -67,6 +122,33 @@ class TelloProxyAdapter:
         except Exception as e:
             raise Exception(f"Proxy error: {str(e)}")
 
+    def _invalidate_status(self):
+        """Drop the cached status snapshot (call after state-changing commands)"""
+        self._status_cache = None
+        self._status_cache_ts = 0.0
+
+    def _get_status(self) -> dict:
+        """
+        Status dict from the proxy, served from the TTL cache when fresh
+
+        Raises:
+            Exception: If the proxy reports failure
+        """
+        now = time.monotonic()
+        if self._status_cache is not None and now - self._status_cache_ts < self._status_ttl:
+            return self._status_cache
+
+        result = self._call_proxy('/api/status')
+
+        if not result.get('success'):
+            error = result.get('error', 'Unknown error')
+            raise Exception(f"Failed to get status: {error}")
+
+        status = result.get('status', {})
+        self._status_cache = status
+        self._status_cache_ts = now
+        return status
+
     def connect(self):
         """
         Connect to Tello via proxy
@@ -80,6 +162,7 @@ class TelloProxyAdapter:
 
         if result.get('success'):
             self.connected = True
+            self._invalidate_status()
             print(f"✅ Connected to Tello. Battery: {result.get('battery', 'N/A')}%")
         else:
             error = result.get('error', 'Unknown error')
@@ -99,6 +182,8 @@ class TelloProxyAdapter:
             Exception: If command fails
         """
         result = self._call_proxy('/api/command', method='POST', json_data={'command': command})
+        # Commands can change height/battery; don't serve a pre-command snapshot
+        self._invalidate_status()
 
         if result.get('success'):
             return result.get('response', 'ok')
@@ -106,6 +191,46 @@ class TelloProxyAdapter:
             error = result.get('error', 'Unknown error')
             raise Exception(f"Command '{command}' failed: {error}")
 
+    def send_commands(self, commands) -> list:
+        """
+        Send several control commands in one proxy round-trip
+
+        Args:
+            commands: Sequence of command strings (e.g. ['takeoff', 'up 50'])
+
+        Returns:
+            List of responses, one per executed command
+
+        Raises:
+            Exception: If any command fails
+        """
+        commands = list(commands)
+        if not commands:
+            return []
+
+        if not self._bulk_supported:
+            return [self.send_control_command(command) for command in commands]
+
+        try:
+            result = self._call_proxy('/api/commands', method='POST',
+                                      json_data={'commands': commands})
+        except Exception as e:
+            # Older proxies predate /api/commands; fall back to one request
+            # per command and remember so we don't probe again
+            if '404' in str(e):
+                self._bulk_supported = False
+                return [self.send_control_command(command) for command in commands]
+            self._invalidate_status()
+            raise
+
+        self._invalidate_status()
+
+        if result.get('success'):
+            return result.get('responses', [])
+        else:
+            error = result.get('error', 'Unknown error')
+            raise Exception(f"Batched commands failed: {error}")
+
     def get_battery(self) -> int:
         """
         Get battery level
@@ -116,19 +241,32 @@ class TelloProxyAdapter:
         Raises:
             Exception: If request fails
         """
-        result = self._call_proxy('/api/status')
+        return self._status_int(self._get_status(), 'battery')
 
-        if result.get('success'):
-            status = result.get('status', {})
-            battery_str = status.get('battery', '0')
-            # Handle 'N/A' or other non-numeric values
-            try:
-                return int(battery_str) if battery_str != 'N/A' else 0
-            except (ValueError, TypeError):
-                return 0
-        else:
-            error = result.get('error', 'Unknown error')
-            raise Exception(f"Failed to get battery: {error}")
+    @staticmethod
+    def _status_int(status: dict, key: str) -> int:
+        """Parse an int field from a proxy status dict, treating 'N/A'/garbage as 0"""
+        value = status.get(key, '0')
+        try:
+            return int(value) if value != 'N/A' else 0
+        except (ValueError, TypeError):
+            return 0
+
+    def get_state(self) -> dict:
+        """
+        Get battery, temperature, height and flight time in one proxy round-trip
+
+        Returns:
+            Dict with 'battery', 'temperature', 'height', 'flight_time' keys
+        """
+        status = self._get_status()
+        return {
+            'battery': self._status_int(status, 'battery'),
+            'temperature': self._status_int(status, 'temperature'),
+            'height': self._status_int(status, 'height'),
+            # Status endpoint doesn't return flight time, return 0
+            'flight_time': 0,
+        }
 
     def query_sdk_version(self) -> str:
         """
@@ -155,15 +293,7 @@ class TelloProxyAdapter:
         Returns:
             Height in cm
         """
-        result = self._call_proxy('/api/status')
-        if result.get('success'):
-            status = result.get('status', {})
-            height_str = status.get('height', '0')
-            try:
-                return int(height_str) if height_str != 'N/A' else 0
-            except (ValueError, TypeError):
-                return 0
-        return 0
+        return self._status_int(self._get_status(), 'height')
 
     def get_temperature(self) -> int:
         """
@@ -172,15 +302,7 @@ class TelloProxyAdapter:
         Returns:
             Average temperature in Celsius
         """
-        result = self._call_proxy('/api/status')
-        if result.get('success'):
-            status = result.get('status', {})
-            temp_str = status.get('temperature', '0')
-            try:
-                return int(temp_str) if temp_str != 'N/A' else 0
-            except (ValueError, TypeError):
-                return 0
-        return 0
+        return self._status_int(self._get_status(), 'temperature')
 
     def get_barometer(self) -> float:
         """
@@ -189,11 +311,7 @@ class TelloProxyAdapter:
         Returns:
             Barometer value
         """
-        result = self._call_proxy('/api/status')
-        if result.get('success'):
-            status = result.get('status', {})
-            # Status endpoint doesn't return barometer, return 0.0
-            return 0.0
+        # Status endpoint doesn't return barometer, return 0.0
         return 0.0
 
     def get_flight_time(self) -> int:
@@ -203,11 +321,7 @@ class TelloProxyAdapter:
         Returns:
             Flight time in seconds
         """
-        result = self._call_proxy('/api/status')
-        if result.get('success'):
-            status = result.get('status', {})
-            # Status endpoint doesn't return flight time, return 0
-            return 0
+        # Status endpoint doesn't return flight time, return 0
         return 0
 
     # Movement commands